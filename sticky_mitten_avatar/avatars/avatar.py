@@ -1,24 +1,23 @@
 import matplotlib.pyplot
-from typing import Dict, Union, List, Optional
+from math import acos, asin, atan2, cos, hypot, pi, sin, sqrt
+from typing import Dict, Union, List, Optional, Tuple, Set
 import numpy as np
 from abc import ABC, abstractmethod
 from ikpy.chain import Chain
-from ikpy.utils import geometry
-from enum import Enum
-from tdw.output_data import OutputData, AvatarStickyMittenSegmentationColors, AvatarStickyMitten, Collision, \
-    EnvironmentCollision
+from enum import IntEnum
+from tdw.output_data import AvatarStickyMittenSegmentationColors, AvatarStickyMitten, Collision, EnvironmentCollision
 from tdw.tdw_utils import TDWUtils
-from sticky_mitten_avatar.util import get_angle_between, rotate_point_around, FORWARD
+from sticky_mitten_avatar.util import get_angle_between, rotate_point_around, iter_resp, RespIndex, FORWARD
 from sticky_mitten_avatar.body_part_static import BodyPartStatic
 from sticky_mitten_avatar.task_status import TaskStatus
 
 
-class Arm(Enum):
+class Arm(IntEnum):
     """
     The side that an arm is on.
     """
 
-    left = 0,
+    left = 0
     right = 1
 
 
@@ -54,10 +53,65 @@ class _IKGoal:
         """
 
         self.pick_up_id = pick_up_id
-        if target is not None and isinstance(target, list):
-            self.target = np.array(target)
+        if target is not None:
+            self.target = np.asarray(target, dtype=np.float32)
         else:
-            self.target = target
+            self.target = None
+
+
+class FrameCache:
+    """
+    Per-frame avatar data, converted to numpy arrays once per frame.
+
+    Fields:
+
+    - `raw` The `tdw.output_data.AvatarStickyMitten` output data for this frame.
+    - `position` The position of the avatar.
+    - `forward` The forward directional vector of the avatar.
+    - `mitten_left` The position of the center of the left mitten.
+    - `mitten_right` The position of the center of the right mitten.
+    - `angles_left` The angles of each joint of the left arm.
+    - `angles_right` The angles of each joint of the right arm.
+    - `mittens` A tuple of `mitten_left` and `mitten_right`, indexed by `Arm`.
+    - `angles` A tuple of `angles_left` and `angles_right`, indexed by `Arm`.
+    """
+
+    def __init__(self, avsm: AvatarStickyMitten):
+        """
+        :param avsm: The `AvatarStickyMitten` output data for this frame.
+        """
+
+        self.raw = avsm
+        self.position = np.array(avsm.get_position(), dtype=np.float32)
+        self.forward = np.array(avsm.get_forward(), dtype=np.float32)
+        self.mitten_left = np.array(avsm.get_mitten_center_left_position(), dtype=np.float32)
+        self.mitten_right = np.array(avsm.get_mitten_center_right_position(), dtype=np.float32)
+        self.angles_left = np.array(avsm.get_angles_left(), dtype=np.float32)
+        self.angles_right = np.array(avsm.get_angles_right(), dtype=np.float32)
+        self.mittens: Tuple[np.array, np.array] = (self.mitten_left, self.mitten_right)
+        self.angles: Tuple[np.array, np.array] = (self.angles_left, self.angles_right)
+
+
+class _ArmGeometry:
+    """
+    Static geometry of an arm chain, used by the analytic IK solver.
+    """
+
+    def __init__(self, chain: Chain):
+        """
+        :param chain: The IK chain of the arm.
+        """
+
+        links = chain.links
+        # The position of the shoulder relative to the avatar.
+        self.shoulder = np.array(links[1].translation_vector, dtype=np.float32)
+        # The distance from the shoulder to the elbow.
+        self.upper_length = float(np.linalg.norm(links[4].translation_vector))
+        # The distance from the elbow to the mitten, assuming that the wrist is straight.
+        self.lower_length = float(sum([np.linalg.norm(link.translation_vector) for link in links[5:]]))
+        # The (min, max) angles of each joint, in radians.
+        self.bounds: List[Tuple[float, float]] = [link.bounds for link in links[1:-1]]
+        self.num_links = len(links)
 
 
 class Avatar(ABC):
@@ -69,7 +123,7 @@ class Avatar(ABC):
 
     - `id` The ID of the avatar.
     - `body_parts_static` Static body parts data. Key = the name of the part. See `BodyPartsStatic`
-    - `frame` Dynamic info for the avatar on this frame, such as its position. See `tdw.output_data.AvatarStickyMitten`
+    - `frame` Dynamic info for the avatar on this frame, such as its position. See `FrameCache`
     - `status` The current `TaskStatus` of the avatar.
     """
 
@@ -89,6 +143,15 @@ class Avatar(ABC):
     _BEND_FORCE = 120
     # Damper delta when bending joints.
     _BEND_DAMPER = -300
+    # Squared distance thresholds (meters). Distances are compared as squares to avoid square roots.
+    # Targets closer than this to the avatar are too close to reach.
+    _MIN_REACH_SQ = 0.2 ** 2
+    # If the IK solution misses the target by more than this, the target is too far to reach.
+    _MAX_IK_ERROR_SQ = 0.125 ** 2
+    # If the mitten is closer than this to the IK target, the arm is at the target.
+    _AT_TARGET_SQ = 0.1 ** 2
+    # If the analytic IK solution misses the target by more than this, use ikpy's solution instead.
+    _ANALYTIC_IK_ERROR_SQ = 0.01 ** 2
 
     def __init__(self, resp: List[bytes], avatar_id: str = "a", debug: bool = False):
         """
@@ -99,28 +162,31 @@ class Avatar(ABC):
 
         self.id = avatar_id
         self._debug = debug
-        # Set the arm chains.
-        self._arms: Dict[Arm, Chain] = {Arm.left: self._get_left_arm(),
-                                        Arm.right: self._get_right_arm()}
+        self._init_ik()
         # Any current IK goals.
-        self._ik_goals: Dict[Arm, Optional[_IKGoal]] = {Arm.left: None,
-                                                        Arm.right: None}
+        self._ik_goals: List[Optional[_IKGoal]] = [None, None]
+        # Templates of the bend, force, and damper commands of each joint of each arm.
+        self._joint_command_templates: List[List[Tuple[dict, dict, dict]]] = \
+            [self._get_joint_command_templates(arm=arm) for arm in (Arm.left, Arm.right)]
         smsc: Optional[AvatarStickyMittenSegmentationColors] = None
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "smsc":
-                q = AvatarStickyMittenSegmentationColors(resp[i])
+        avsm: Optional[AvatarStickyMitten] = None
+        for r_id, r in iter_resp(resp):
+            if r_id == "smsc" and smsc is None:
+                q = AvatarStickyMittenSegmentationColors(r)
                 if q.get_id() == avatar_id:
                     smsc = q
-                    break
+            elif r_id == "avsm" and avsm is None:
+                q = AvatarStickyMitten(r)
+                if q.get_avatar_id() == avatar_id:
+                    avsm = q
         assert smsc is not None, f"No avatar segmentation colors found for {avatar_id}"
 
         # Get data for the current frame.
-        self.frame = self._get_frame(resp)
+        self.frame = self._get_frame(avsm)
         # Get the masses of each body part.
         body_part_masses: Dict[int, float] = dict()
-        for i in range(self.frame.get_num_rigidbody_parts()):
-            body_part_masses[self.frame.get_rigidbody_part_id(i)] = self.frame.get_rigidbody_part_mass(i)
+        for i in range(self.frame.raw.get_num_rigidbody_parts()):
+            body_part_masses[self.frame.raw.get_rigidbody_part_id(i)] = self.frame.raw.get_rigidbody_part_mass(i)
 
         # Cache static data of body parts.
         self.body_parts_static: Dict[int, BodyPartStatic] = dict()
@@ -135,6 +201,8 @@ class Avatar(ABC):
                                  name=smsc.get_body_part_name(i),
                                  mass=mass)
             self.body_parts_static[body_part_id] = bps
+        # The IDs of the body parts, for fast membership tests.
+        self._body_part_ids: Set[int] = set(self.body_parts_static.keys())
 
         # Start dynamic data.
         self.collisions: Dict[int, List[int]] = dict()
@@ -142,6 +210,38 @@ class Avatar(ABC):
 
         self.status = TaskStatus.idle
 
+    def _init_ik(self) -> None:
+        """
+        Set the arm chains and the data that the IK solvers use. This doesn't require a response from the build.
+        """
+
+        # Set the arm chains.
+        # Per-arm data is stored in lists indexed by `Arm`.
+        self._arms: List[Chain] = [self._get_left_arm(), self._get_right_arm()]
+        # Cache the geometry of each arm for the analytic IK solver.
+        self._arm_geometry: List[_ArmGeometry] = [_ArmGeometry(chain) for chain in self._arms]
+        # If a target is farther than this from the shoulder, no IK solution can be within the IK error threshold.
+        self._max_reach_sq: List[float] = [(g.upper_length + g.lower_length + sqrt(Avatar._MAX_IK_ERROR_SQ)) ** 2
+                                           for g in self._arm_geometry]
+        # The previous ikpy solution of each arm. This is the initial position of the next ikpy solution.
+        self._ikpy_rotations: List[Optional[np.array]] = [None, None]
+
+    @classmethod
+    def _get_ik_solver(cls, debug: bool = False) -> "Avatar":
+        """
+        Create an avatar without a response from the build. Only the IK methods can be used, e.g. `can_reach_target()`.
+        This is used for testing.
+
+        :param debug: If True, print debug statements.
+
+        :return: The avatar.
+        """
+
+        avatar = cls.__new__(cls)
+        avatar._debug = debug
+        avatar._init_ik()
+        return avatar
+
     def can_reach_target(self, target: np.array, arm: Arm) -> TaskStatus:
         """
         :param target: The target position.
@@ -150,31 +250,31 @@ class Avatar(ABC):
         :return: A `TaskResult` value describing whether the avatar can reach the target and, if not, why.
         """
 
-        pos = np.array([target[0], target[2]])
-        d = np.linalg.norm(pos)
-        if d < 0.2:
+        d2 = target[0] * target[0] + target[2] * target[2]
+        if d2 < Avatar._MIN_REACH_SQ:
             if self._debug:
-                print(f"Target {target} is too close to the avatar: {np.linalg.norm(d)}")
+                print(f"Target {target} is too close to the avatar: {sqrt(d2)}")
             return TaskStatus.too_close_to_reach
         if target[2] < 0:
             if self._debug:
                 print(f"Target {target} z < 0")
             return TaskStatus.behind_avatar
 
+        # Skip the IK solution if the target is obviously out of reach.
+        delta = target - self._arm_geometry[arm].shoulder
+        d2 = delta @ delta
+        if d2 > self._max_reach_sq[arm]:
+            if self._debug:
+                print(f"Target {target} is too far away from the {arm.name} shoulder: {sqrt(d2)}")
+            return TaskStatus.too_far_to_reach
+
         # Check if the IK solution reaches the target.
-        chain = self._arms[arm]
         joints, ik_target = self._get_ik(target=target, arm=arm)
-        transformation_matrixes = chain.forward_kinematics(list(joints), full_kinematics=True)
-        nodes = []
-        for (index, link) in enumerate(chain.links):
-            (node, orientation) = geometry.from_transformation_matrix(transformation_matrixes[index])
-            nodes.append(node)
-        destination = np.array(nodes[-1][:-1])
-
-        d = np.linalg.norm(destination - target)
-        if d > 0.125:
+        delta = self._get_mitten_position(arm=arm, rotations=joints) - target
+        d2 = delta @ delta
+        if d2 > Avatar._MAX_IK_ERROR_SQ:
             if self._debug:
-                print(f"Target {target} is too far away from {arm}: {d}")
+                print(f"Target {target} is too far away from {arm}: {sqrt(d2)}")
             return TaskStatus.too_far_to_reach
         return TaskStatus.success
 
@@ -192,42 +292,32 @@ class Avatar(ABC):
         # Get the IK solution.
         rotations, ik_target = self._get_ik(target=target, arm=arm, target_orientation=target_orientation)
 
-        angle = get_angle_between(v1=FORWARD, v2=self.frame.get_forward())
-        target = rotate_point_around(point=ik_target, angle=angle) + self.frame.get_position()
+        angle = get_angle_between(v1=FORWARD, v2=self.frame.forward)
+        target = rotate_point_around(point=ik_target, angle=angle) + self.frame.position
 
         self._ik_goals[arm] = _IKGoal(target=target)
 
-        commands = []
+        templates = self._joint_command_templates[arm]
+        # Preallocate the list of commands: (debug commands) + 3 commands per joint.
+        i = 2 if self._debug else 0
+        commands: List[Optional[dict]] = [None] * (i + 3 * len(templates))
         if self._debug:
             print([np.rad2deg(r) for r in rotations])
-            self._plot_ik(target=ik_target, arm=arm)
+            self._plot_ik(target=ik_target, arm=arm, rotations=rotations)
 
             # Show the target.
-            commands.extend([{"$type": "remove_position_markers"},
-                             {"$type": "add_position_marker",
-                              "position": TDWUtils.array_to_vector3(target)}])
-
-        a = arm.name
-        for c, r in zip(self._arms[arm].links[1:-1], rotations[1:-1]):
-            j = c.name.split("_")
-            joint = f"{j[0]}_{a}"
-            axis = j[1]
+            commands[0] = {"$type": "remove_position_markers"}
+            commands[1] = {"$type": "add_position_marker",
+                           "position": TDWUtils.array_to_vector3(target)}
+
+        # The joints in `JOINTS` are in the same order as the links in the arm's chain.
+        # Convert the angles of all of the joints to degrees at once.
+        for (bend, force, damper), angle in zip(templates, np.rad2deg(rotations[1:-1])):
             # Apply the motion. Strengthen the joint.
-            commands.extend([{"$type": "bend_arm_joint_to",
-                             "angle": np.rad2deg(r),
-                              "joint": joint,
-                              "axis": axis,
-                              "avatar_id": self.id},
-                             {"$type": "adjust_joint_force_by",
-                              "delta": Avatar._BEND_FORCE,
-                              "joint": joint,
-                              "axis": axis,
-                              "avatar_id": self.id},
-                             {"$type": "adjust_joint_damper_by",
-                              "delta": Avatar._BEND_DAMPER,
-                              "joint": joint,
-                              "axis": axis,
-                              "avatar_id": self.id}])
+            commands[i] = {**bend, "angle": angle}
+            commands[i + 1] = {**force, "delta": Avatar._BEND_FORCE}
+            commands[i + 2] = {**damper, "delta": Avatar._BEND_DAMPER}
+            i += 3
         return commands
 
     def grasp_object(self, object_id: int, target: np.array, arm: Arm) -> List[dict]:
@@ -242,12 +332,16 @@ class Avatar(ABC):
         """
 
         # Get the mitten's position.
-        if arm == Arm.left:
-            mitten = np.array(self.frame.get_mitten_center_left_position())
+        mitten = self.frame.mittens[arm]
+
+        # Normalize the direction from the target to the mitten.
+        # If the mitten is already at the target, there is no direction.
+        direction = mitten - target
+        d2 = direction @ direction
+        if d2 > 0:
+            target_orientation = direction * (1.0 / sqrt(d2))
         else:
-            mitten = np.array(self.frame.get_mitten_center_right_position())
-
-        target_orientation = (mitten - target) / np.linalg.norm(mitten - target)
+            target_orientation = None
 
         target = self.get_rotated_target(target=target)
 
@@ -255,49 +349,53 @@ class Avatar(ABC):
         self._ik_goals[arm].pick_up_id = object_id
         return commands
 
-    def on_frame(self, resp: List[bytes]) -> List[dict]:
+    def on_frame(self, resp: Union[List[bytes], RespIndex]) -> List[dict]:
         """
         Update the avatar based on its current arm-bending goals and its state.
         If the avatar has achieved a goal (for example, picking up an object), it will stop moving that arm.
         Update the avatar's state as needed.
 
-        :param resp: The response from the build.
+        :param resp: The response from the build, or a `RespIndex` of the response.
 
         :return: A list of commands to pick up, stop moving, etc.
         """
 
-        # Update dynamic data.
-        frame = self._get_frame(resp=resp)
+        if not isinstance(resp, RespIndex):
+            resp = RespIndex(resp)
         # Update dynamic collision data.
         self.collisions.clear()
         self.env_collisions.clear()
         # Get each collision.
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "coll":
-                coll = Collision(resp[i])
-                collider_id = coll.get_collider_id()
-                collidee_id = coll.get_collidee_id()
-                # Check if the collision includes a body part.
-                if collider_id in self.body_parts_static and collidee_id not in self.body_parts_static:
-                    if collider_id not in self.collisions:
-                        self.collisions[collider_id] = []
-                    self.collisions[collider_id].append(collidee_id)
-                elif collidee_id in self.body_parts_static and collider_id not in self.body_parts_static:
-                    if collidee_id not in self.collisions:
-                        self.collisions[collidee_id] = []
-                    self.collisions[collidee_id].append(collider_id)
-            elif r_id == "enco":
-                coll = EnvironmentCollision(resp[i])
-                collider_id = coll.get_object_id()
-                if collider_id in self.body_parts_static:
-                    self.env_collisions.append(collider_id)
+        for r in resp.get("coll"):
+            coll = Collision(r)
+            collider_id = coll.get_collider_id()
+            collidee_id = coll.get_collidee_id()
+            # Check if the collision is between a body part and something that isn't a body part.
+            collider_is_body_part = collider_id in self._body_part_ids
+            if collider_is_body_part != (collidee_id in self._body_part_ids):
+                if collider_is_body_part:
+                    self.collisions.setdefault(collider_id, []).append(collidee_id)
+                else:
+                    self.collisions.setdefault(collidee_id, []).append(collider_id)
+        for r in resp.get("enco"):
+            collider_id = EnvironmentCollision(r).get_object_id()
+            if collider_id in self._body_part_ids:
+                self.env_collisions.append(collider_id)
+        # Get the avatar's data for this frame.
+        avsm: Optional[AvatarStickyMitten] = None
+        for r in resp.get("avsm"):
+            q = AvatarStickyMitten(r)
+            if q.get_avatar_id() == self.id:
+                avsm = q
+                break
+        # Update dynamic data.
+        frame = self._get_frame(avsm)
 
         # Check if IK goals are done.
-        temp_goals: Dict[Arm, Optional[_IKGoal]] = dict()
+        temp_goals: List[Optional[_IKGoal]] = [None, None]
         # Get commands for the next frame.
         commands: List[dict] = []
-        for arm in self._ik_goals:
+        for arm in (Arm.left, Arm.right):
             # No IK goal on this arm.
             if self._ik_goals[arm] is None:
                 temp_goals[arm] = None
@@ -306,13 +404,9 @@ class Avatar(ABC):
                 temp_goals[arm] = self._ik_goals[arm]
             else:
                 # Is the arm at the target?
-                if arm == Arm.left:
-                    mitten_position = np.array(frame.get_mitten_center_left_position())
-                else:
-                    mitten_position = np.array(frame.get_mitten_center_right_position())
-                # If we're at the position, stop.
-                d = np.linalg.norm(mitten_position - self._ik_goals[arm].target)
-                if d < 0.1:
+                # If we're at the position, stop. Compare squared distances to avoid a square root.
+                delta = frame.mittens[arm] - self._ik_goals[arm].target
+                if delta @ delta < Avatar._AT_TARGET_SQ:
                     if self._debug:
                         print(f"{arm.name} mitten is at target position {self._ik_goals[arm].target}. Stopping.")
                     commands.extend(self._stop_arms(arm=arm))
@@ -322,8 +416,8 @@ class Avatar(ABC):
                     # Are we trying to pick up an object?
                     if self._ik_goals[arm].pick_up_id is not None:
                         # Did we pick up the object in the previous frame?
-                        if self._ik_goals[arm].pick_up_id in frame.get_held_left() or self._ik_goals[arm]. \
-                                pick_up_id in frame.get_held_right():
+                        if self._ik_goals[arm].pick_up_id in frame.raw.get_held_left() or self._ik_goals[arm]. \
+                                pick_up_id in frame.raw.get_held_right():
                             if self._debug:
                                 print(f"{arm.name} mitten picked up {self._ik_goals[arm].pick_up_id}. Stopping.")
                             commands.extend(self._stop_arms(arm=arm))
@@ -347,29 +441,17 @@ class Avatar(ABC):
                     # Keep bending the arm.
                     else:
                         temp_goals[arm] = self._ik_goals[arm]
-                        self._ik_goals[arm].previous_distance = d
         self._ik_goals = temp_goals
 
         # Check if the arms are still moving.
-        temp_goals: Dict[Arm, Optional[_IKGoal]] = dict()
-        for arm in self._ik_goals:
+        temp_goals: List[Optional[_IKGoal]] = [None, None]
+        for arm in (Arm.left, Arm.right):
             # No IK goal on this arm.
             if self._ik_goals[arm] is None:
                 temp_goals[arm] = None
             else:
-                # Get the past and present angles.
-                if arm == Arm.left:
-                    angles_0 = self.frame.get_angles_left()
-                    angles_1 = frame.get_angles_left()
-                else:
-                    angles_0 = self.frame.get_angles_right()
-                    angles_1 = frame.get_angles_right()
-                # Is any joint still moving?
-                moving = False
-                for a0, a1 in zip(angles_0, angles_1):
-                    if np.abs(a0 - a1) > 0.03:
-                        moving = True
-                        break
+                # Is any joint still moving? Compare the past and present angles.
+                moving = (np.abs(frame.angles[arm] - self.frame.angles[arm]) > 0.03).any()
                 # Keep moving.
                 if moving:
                     temp_goals[arm] = self._ik_goals[arm]
@@ -414,13 +496,8 @@ class Avatar(ABC):
         :return: A list of commands to drop arms to their starting positions.
         """
 
-        commands = []
-        for j in self.JOINTS:
-            commands.append({"$type": "bend_arm_joint_to",
-                             "joint": j.joint,
-                             "axis": j.axis,
-                             "angle": 0,
-                             "avatar_id": self.id})
+        commands = [{**bend, "angle": 0} for arm in (Arm.left, Arm.right)
+                    for bend, force, damper in self._joint_command_templates[arm]]
         # Add some dummy IK goals.
         self.set_dummy_ik_goals()
         return commands
@@ -431,7 +508,7 @@ class Avatar(ABC):
         There's no target, so the avatar will just bend the arms until they stop moving.
         """
 
-        for arm in self._ik_goals:
+        for arm in (Arm.left, Arm.right):
             self._ik_goals[arm] = _IKGoal(target=None)
 
     def is_holding(self, object_id: int) -> (bool, Arm):
@@ -441,9 +518,9 @@ class Avatar(ABC):
         :return: True if the avatar is holding the object and, if so, the arm holding the object.
         """
 
-        if object_id in self.frame.get_held_left():
+        if object_id in self.frame.raw.get_held_left():
             return True, Arm.left
-        elif object_id in self.frame.get_held_right():
+        elif object_id in self.frame.raw.get_held_right():
             return True, Arm.right
         return False, Arm.left
 
@@ -454,38 +531,49 @@ class Avatar(ABC):
         :return: Commands to stop all arm movement.
         """
 
-        if arm == Arm.left:
-            joints = Avatar.JOINTS[:6]
-            angles = self.frame.get_angles_left()
-        else:
-            joints = Avatar.JOINTS[6:]
-            angles = self.frame.get_angles_right()
-
-        commands = []
+        angles = self.frame.angles[arm]
+        templates = self._joint_command_templates[arm]
+        # Preallocate the list of commands: 3 commands per joint.
+        commands: List[Optional[dict]] = [None] * (3 * len(templates))
+        i = 0
         # Get the current angle and bend the joint to that angle.
-        for j, a in zip(joints, angles):
+        for (bend, force, damper), a in zip(templates, angles):
             theta = float(a)
             if theta > 90:
                 theta = 180 - theta
             # Set the joint positions to where they are.
             # Reset force and damper.
-            commands.extend([{"$type": "bend_arm_joint_to",
-                              "angle": theta,
-                              "joint": j.joint,
-                              "axis": j.axis,
-                              "avatar_id": self.id},
-                             {"$type": "adjust_joint_force_by",
-                              "delta": -Avatar._BEND_FORCE,
-                              "joint": j.joint,
-                              "axis": j.axis,
-                              "avatar_id": self.id},
-                             {"$type": "adjust_joint_damper_by",
-                              "delta": -Avatar._BEND_DAMPER,
-                              "joint": j.joint,
-                              "axis": j.axis,
-                              "avatar_id": self.id}])
+            commands[i] = {**bend, "angle": theta}
+            commands[i + 1] = {**force, "delta": -Avatar._BEND_FORCE}
+            commands[i + 2] = {**damper, "delta": -Avatar._BEND_DAMPER}
+            i += 3
         return commands
 
+    def _get_joint_command_templates(self, arm: Arm) -> List[Tuple[dict, dict, dict]]:
+        """
+        :param arm: The arm.
+
+        :return: For each joint of the arm: Templates of the bend, force, and damper commands, without the angle or delta.
+        """
+
+        templates: List[Tuple[dict, dict, dict]] = list()
+        for j in Avatar.JOINTS:
+            if j.arm != arm.name:
+                continue
+            templates.append(({"$type": "bend_arm_joint_to",
+                               "joint": j.joint,
+                               "axis": j.axis,
+                               "avatar_id": self.id},
+                              {"$type": "adjust_joint_force_by",
+                               "joint": j.joint,
+                               "axis": j.axis,
+                               "avatar_id": self.id},
+                              {"$type": "adjust_joint_damper_by",
+                               "joint": j.joint,
+                               "axis": j.axis,
+                               "avatar_id": self.id}))
+        return templates
+
     @abstractmethod
     def _get_left_arm(self) -> Chain:
         """
@@ -501,19 +589,16 @@ class Avatar(ABC):
 
         raise Exception()
 
-    def _get_frame(self, resp: List[bytes]) -> AvatarStickyMitten:
+    def _get_frame(self, avsm: Optional[AvatarStickyMitten]) -> FrameCache:
         """
-        :param resp: The response from the build.
+        :param avsm: The AvatarStickyMitten output data for this avatar on this frame. Can be None.
 
-        :return: AvatarStickyMitten output data for this avatar on this frame.
+        :return: Cached AvatarStickyMitten output data for this avatar on this frame.
         """
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "avsm":
-                avsm = AvatarStickyMitten(resp[i])
-                if avsm.get_avatar_id() == self.id:
-                    return avsm
-        raise Exception(f"No avatar data found for {self.id}")
+
+        if avsm is None:
+            raise Exception(f"No avatar data found for {self.id}")
+        return FrameCache(avsm)
 
     def get_rotated_target(self, target: np.array) -> np.array:
         """
@@ -522,23 +607,24 @@ class Avatar(ABC):
         :param target: The target position.
         :return: The rotated position.
         """
-        angle = get_angle_between(v1=FORWARD, v2=self.frame.get_forward())
+        angle = get_angle_between(v1=FORWARD, v2=self.frame.forward)
 
-        return rotate_point_around(point=target - self.frame.get_position(), angle=-angle)
+        return rotate_point_around(point=target - self.frame.position, angle=-angle)
 
-    def _plot_ik(self, target: np.array, arm: Arm) -> None:
+    def _plot_ik(self, target: np.array, arm: Arm, rotations: np.array) -> None:
         """
         Debug an IK solution by creating a plot.
 
         :param target: The target position.
         :param arm: The arm.
+        :param rotations: The IK solution.
         """
 
         chain = self._arms[arm]
 
         ax = matplotlib.pyplot.figure().add_subplot(111, projection='3d')
 
-        chain.plot(chain.inverse_kinematics(target_position=target), ax, target=target)
+        chain.plot(rotations, ax, target=target)
         matplotlib.pyplot.show()
 
     def _get_ik(self, target: np.array, arm: Arm, target_orientation: np.array = None) -> (List[float], np.array):
@@ -550,8 +636,160 @@ class Avatar(ABC):
         :return: The IK angles and the IK target.
         """
 
-        ik_target = np.array(target)
+        ik_target = np.array(target, dtype=np.float32)
 
         # Get the IK solution.
-        rotations = self._arms[arm].inverse_kinematics(target_position=ik_target, target_orientation=target_orientation)
+        analytic_rotations = self._analytic_ik(arm=arm, target=ik_target)
+        delta = self._get_mitten_position(arm=arm, rotations=analytic_rotations) - ik_target
+        d2 = delta @ delta
+        rotations = analytic_rotations
+        solver = "analytic"
+        # The analytic solution keeps the wrist straight and can't roll the shoulder past its limits.
+        # If it misses the target, try ikpy's iterative solution and use whichever solution is closer to the target.
+        # In debug mode, always get the ikpy solution to compare the solutions.
+        if d2 > Avatar._ANALYTIC_IK_ERROR_SQ or self._debug:
+            ikpy_rotations, ikpy_d2 = self._get_ikpy_ik(arm=arm, target=ik_target,
+                                                        target_orientation=target_orientation)
+            if d2 > Avatar._ANALYTIC_IK_ERROR_SQ and ikpy_d2 < d2:
+                rotations = ikpy_rotations
+                solver = "ikpy"
+            if self._debug:
+                print(f"Analytic IK: {np.rad2deg(analytic_rotations)} (error: {sqrt(d2)})\n"
+                      f"ikpy IK: {np.rad2deg(ikpy_rotations)} (error: {sqrt(ikpy_d2)})\n"
+                      f"Using the {solver} IK solution.")
         return rotations, ik_target
+
+    def _get_ikpy_ik(self, arm: Arm, target: np.array, target_orientation: np.array = None) -> (np.array, float):
+        """
+        Solve IK with ikpy's iterative optimizer.
+        Start from the previous ikpy solution of the arm; consecutive targets are usually near each other.
+        If that solution misses the target, solve again from the default initial position and use the closer solution.
+
+        :param arm: The arm.
+        :param target: The target position relative to the avatar.
+        :param target_orientation: The target orientation. Can be None.
+
+        :return: Tuple: The angle of each link in the chain in radians (including the origin and mitten links); the squared distance from the mitten to the target.
+        """
+
+        warm_start = self._ikpy_rotations[arm] is not None
+        rotations = self._arms[arm].inverse_kinematics(target_position=target,
+                                                       target_orientation=target_orientation,
+                                                       initial_position=self._ikpy_rotations[arm])
+        delta = self._get_mitten_position(arm=arm, rotations=rotations) - target
+        d2 = delta @ delta
+        # The previous solution can lead the optimizer to a worse local minimum.
+        if warm_start and d2 > Avatar._ANALYTIC_IK_ERROR_SQ:
+            cold_rotations = self._arms[arm].inverse_kinematics(target_position=target,
+                                                                target_orientation=target_orientation)
+            delta = self._get_mitten_position(arm=arm, rotations=cold_rotations) - target
+            if delta @ delta < d2:
+                rotations = cold_rotations
+                d2 = delta @ delta
+        self._ikpy_rotations[arm] = rotations
+        return rotations, d2
+
+    def _get_mitten_position(self, arm: Arm, rotations: np.array) -> np.array:
+        """
+        :param arm: The arm.
+        :param rotations: The angle of each link in the arm's chain in radians.
+
+        :return: The position of the mitten relative to the avatar, given the rotations (forward kinematics).
+        """
+
+        return self._arms[arm].forward_kinematics(list(rotations))[:3, 3]
+
+    def _analytic_ik(self, arm: Arm, target: np.array) -> np.array:
+        """
+        Solve IK for the arm in closed form.
+        The upper arm and the forearm+mitten are treated as a two-bone chain; the wrist stays straight.
+        The law of cosines gives the elbow angle. Then, the shoulder is rotated such that the mitten is at the target.
+        Shoulder roll is only used if the target can't be reached with shoulder pitch and yaw alone.
+
+        :param arm: The arm.
+        :param target: The target position relative to the avatar.
+
+        :return: The angle of each link in the chain in radians (including the origin and mitten links).
+        """
+
+        arm_geometry = self._arm_geometry[arm]
+        lab = arm_geometry.upper_length
+        lcb = arm_geometry.lower_length
+        d = target - arm_geometry.shoulder
+        d_length = sqrt(d[0] * d[0] + d[1] * d[1] + d[2] * d[2])
+        if d_length < 1e-6:
+            d = FORWARD
+            d_length = 1
+        # Clamp the distance to the target such that the triangle is valid.
+        lat = min(max(d_length, 1e-4), lab + lcb - 1e-4)
+
+        # The angle at the elbow and the angle between the upper arm and the target.
+        elbow = pi - acos(min(max((lab * lab + lcb * lcb - lat * lat) / (2 * lab * lcb), -1), 1))
+        alpha = acos(min(max((lab * lab + lat * lat - lcb * lcb) / (2 * lab * lat), -1), 1))
+
+        # The direction to the target in the shoulder's frame (after the link's -90 degree pitch orientation).
+        wx = d[0] / d_length
+        wy = -d[2] / d_length
+        wz = d[1] / d_length
+        # The direction to the mitten in the frame of the upper arm.
+        ly = -sin(alpha)
+        lz = -cos(alpha)
+
+        # Try rolling the shoulder in either direction. Use the solution that needs less clamping.
+        best: Optional[List[float]] = None
+        best_clamp = 0
+        for sign in [1, -1]:
+            angles, clamp = Avatar._get_shoulder_angles(bounds=arm_geometry.bounds, wx=wx, wy=wy, wz=wz, ly=ly, lz=lz,
+                                                        elbow=elbow, sign=sign)
+            if best is None or clamp < best_clamp:
+                best = angles
+                best_clamp = clamp
+        rotations = np.zeros(arm_geometry.num_links)
+        rotations[1:1 + len(best)] = best
+        return rotations
+
+    @staticmethod
+    def _get_shoulder_angles(bounds: List[Tuple[float, float]], wx: float, wy: float, wz: float, ly: float,
+                             lz: float, elbow: float, sign: int) -> (List[float], float):
+        """
+        :param bounds: The (min, max) angles of each joint.
+        :param wx: The x component of the direction to the target in the shoulder frame.
+        :param wy: The y component of the direction to the target in the shoulder frame.
+        :param wz: The z component of the direction to the target in the shoulder frame.
+        :param ly: The y component of the direction to the mitten in the upper arm frame.
+        :param lz: The z component of the direction to the mitten in the upper arm frame.
+        :param elbow: The elbow angle.
+        :param sign: The direction of the shoulder roll (1 or -1).
+
+        :return: Tuple: The joint angles clamped to their bounds; the total amount of clamping.
+        """
+
+        # Roll the shoulder only as much as is needed to swing the mitten laterally to the target.
+        if ly != 0:
+            s = sign * sqrt(max(0.0, wx * wx - lz * lz)) / -ly
+        else:
+            s = 0
+        roll = asin(min(max(s, -1), 1))
+        roll = min(max(roll, bounds[2][0]), bounds[2][1])
+        qx = -ly * sin(roll)
+        qy = ly * cos(roll)
+        qz = lz
+
+        # Yaw the shoulder to match the lateral component of the target direction.
+        r = hypot(qx, qz)
+        phi = atan2(qx, qz)
+        base = asin(min(max(wx / r, -1), 1)) if r > 0 else 0
+        yaw = min([(b - phi + pi) % (2 * pi) - pi for b in [base, pi - base]], key=abs)
+
+        # Pitch the shoulder to match the remaining components of the target direction.
+        vy = qy
+        vz = -qx * sin(yaw) + qz * cos(yaw)
+        pitch = (atan2(vz, vy) - atan2(wz, wy) + pi) % (2 * pi) - pi
+
+        angles = [pitch, yaw, roll, elbow, 0, 0]
+        clamp = 0
+        for i in range(len(angles)):
+            a = min(max(angles[i], bounds[i][0]), bounds[i][1])
+            clamp += abs(a - angles[i])
+            angles[i] = a
+        return angles, clamp
@@ -4,12 +4,12 @@ from pathlib import Path
 import numpy as np
 from typing import List, Dict, Optional, Tuple, Union
 from tdw.controller import Controller
-from tdw.output_data import OutputData, Rigidbodies, Images, Transforms, CameraMatrices
+from tdw.output_data import Rigidbodies, Images, Transforms, CameraMatrices
 from tdw.py_impact import PyImpact, AudioMaterial, Base64Sound, ObjectInfo
 from tdw.tdw_utils import TDWUtils
 from sticky_mitten_avatar.static_object_info import StaticObjectInfo
 from sticky_mitten_avatar.avatars.avatar import Avatar
-from sticky_mitten_avatar.util import get_data
+from sticky_mitten_avatar.util import get_data, RespIndex
 from sticky_mitten_avatar.avatars import Arm
 from sticky_mitten_avatar.transform import Transform
 
@@ -145,24 +145,27 @@ class FrameData:
     _P = PyImpact(initial_amp=0.01)
     _SURFACE_MATERIAL: AudioMaterial = AudioMaterial.hardwood
 
-    def __init__(self, resp: List[bytes], objects: Dict[int, StaticObjectInfo], avatar: Avatar):
+    def __init__(self, resp: Union[List[bytes], RespIndex], objects: Dict[int, StaticObjectInfo], avatar: Avatar):
         """
-        :param resp: The response from the build.
+        :param resp: The response from the build, or a `RespIndex` of the response.
         :param objects: Static object info per object. Key = the ID of the object in the scene.
         :param avatar: The avatar in the scene.
         """
 
-        self._frame_count = Controller.get_frame(resp[-1])
+        if not isinstance(resp, RespIndex):
+            resp = RespIndex(resp)
+
+        self._frame_count = Controller.get_frame(resp.resp[-1])
 
         self.audio: List[Tuple[Base64Sound, int]] = list()
-        collisions, env_collisions, rigidbodies = FrameData._P.get_collisions(resp=resp)
+        collisions, env_collisions, rigidbodies = FrameData._P.get_collisions(resp=resp.resp)
 
         # Record avatar collisions.
         if avatar is not None:
             self.avatar_object_collisions = avatar.collisions
             self.avatar_env_collisions = avatar.env_collisions
-            self.held_objects = {Arm.left: avatar.frame.get_held_left(),
-                                 Arm.right: avatar.frame.get_held_right()}
+            self.held_objects = {Arm.left: avatar.frame.raw.get_held_left(),
+                                 Arm.right: avatar.frame.raw.get_held_right()}
         else:
             self.avatar_object_collisions = None
             self.avatar_env_collisions = None
@@ -171,11 +174,13 @@ class FrameData:
         # Get the object transform data.
         self.object_transforms: Dict[int, Transform] = dict()
         tr = get_data(resp=resp, d_type=Transforms)
+        # Store all of the object transforms in one array. Each `Transform` is a view of a row.
+        object_transform_data = np.empty((tr.get_num(), 10), dtype=np.float32)
         for i in range(tr.get_num()):
-            o_id = tr.get_id(i)
-            self.object_transforms[o_id] = Transform(position=np.array(tr.get_position(i)),
-                                                     rotation=np.array(tr.get_rotation(i)),
-                                                     forward=np.array(tr.get_forward(i)))
+            self.object_transforms[tr.get_id(i)] = Transform(position=tr.get_position(i),
+                                                             rotation=tr.get_rotation(i),
+                                                             forward=tr.get_forward(i),
+                                                             data=object_transform_data[i])
 
         # Get camera matrix data.
         matrices = get_data(resp=resp, d_type=CameraMatrices)
@@ -183,15 +188,17 @@ class FrameData:
         self.camera_matrix = matrices.get_camera_matrix()
 
         # Get the transform data of the avatar.
-        self.avatar_transform = Transform(position=np.array(avatar.frame.get_position()),
-                                          rotation=np.array(avatar.frame.get_rotation()),
-                                          forward=np.array(avatar.frame.get_forward()))
+        self.avatar_transform = Transform(position=avatar.frame.raw.get_position(),
+                                          rotation=avatar.frame.raw.get_rotation(),
+                                          forward=avatar.frame.raw.get_forward())
         self.avatar_body_part_transforms: Dict[int, Transform] = dict()
-        for i in range(avatar.frame.get_num_body_parts()):
-            self.avatar_body_part_transforms[avatar.frame.get_body_part_id(i)] = Transform(
-                position=np.array(avatar.frame.get_body_part_position(i)),
-                rotation=np.array(avatar.frame.get_body_part_rotation(i)),
-                forward=np.array(avatar.frame.get_body_part_forward(i)))
+        body_part_transform_data = np.empty((avatar.frame.raw.get_num_body_parts(), 10), dtype=np.float32)
+        for i in range(avatar.frame.raw.get_num_body_parts()):
+            self.avatar_body_part_transforms[avatar.frame.raw.get_body_part_id(i)] = Transform(
+                position=avatar.frame.raw.get_body_part_position(i),
+                rotation=avatar.frame.raw.get_body_part_rotation(i),
+                forward=avatar.frame.raw.get_body_part_forward(i),
+                data=body_part_transform_data[i])
 
         # Get the audio of each collision.
         for coll in collisions:
@@ -253,16 +260,15 @@ class FrameData:
         self.id_pass: Optional[np.array] = None
         self.depth_pass: Optional[np.array] = None
         self.image_pass: Optional[np.array] = None
-        for i in range(0, len(resp) - 1):
-            if OutputData.get_data_type_id(resp[i]) == "imag":
-                images = Images(resp[i])
-                for j in range(images.get_num_passes()):
-                    if images.get_pass_mask(j) == "_id":
-                        self.id_pass = images.get_image(j)
-                    elif images.get_pass_mask(j) == "_depth_simple":
-                        self.depth_pass = images.get_image(j)
-                    elif images.get_pass_mask(j) == "_img":
-                        self.image_pass = images.get_image(j)
+        for r in resp.get("imag"):
+            images = Images(r)
+            for j in range(images.get_num_passes()):
+                if images.get_pass_mask(j) == "_id":
+                    self.id_pass = images.get_image(j)
+                elif images.get_pass_mask(j) == "_depth_simple":
+                    self.depth_pass = images.get_image(j)
+                elif images.get_pass_mask(j) == "_img":
+                    self.image_pass = images.get_image(j)
 
     @staticmethod
     def set_surface_material(surface_material: AudioMaterial) -> None:
@@ -12,7 +12,8 @@ from tdw.py_impact import AudioMaterial, PyImpact, ObjectInfo
 from tdw.object_init_data import AudioInitData, TransformInitData
 from sticky_mitten_avatar.avatars import Arm, Baby
 from sticky_mitten_avatar.avatars.avatar import Avatar, Joint, BodyPartStatic
-from sticky_mitten_avatar.util import get_data, get_angle, rotate_point_around, get_angle_between, FORWARD
+from sticky_mitten_avatar.util import get_data, get_angle, rotate_point_around, get_angle_between, FORWARD, \
+    RespIndex
 from sticky_mitten_avatar.static_object_info import StaticObjectInfo
 from sticky_mitten_avatar.frame_data import FrameData
 from sticky_mitten_avatar.task_status import TaskStatus
@@ -390,19 +391,22 @@ class StickyMittenAvatarController(FloorplanController):
         if len(resp) == 1:
             return resp
 
+        # Parse the output data IDs once for this frame.
+        resp_index = RespIndex(resp)
+
         # Update object info.
-        tran = get_data(resp=resp, d_type=Transforms)
-        rigi = get_data(resp=resp, d_type=Rigidbodies)
+        tran = get_data(resp=resp_index, d_type=Transforms)
+        rigi = get_data(resp=resp_index, d_type=Rigidbodies)
 
         if tran is None or rigi is None:
             return resp
 
         # Update the frame data.
-        self.frames.append(FrameData(resp=resp, objects=self.static_object_info, avatar=self._avatar))
+        self.frames.append(FrameData(resp=resp_index, objects=self.static_object_info, avatar=self._avatar))
 
         # Update the avatar. Add new avatar commands for the next frame.
         if self._avatar is not None:
-            self._avatar_commands.extend(self._avatar.on_frame(resp=resp))
+            self._avatar_commands.extend(self._avatar.on_frame(resp=resp_index))
 
         return resp
 
@@ -536,11 +540,8 @@ class StickyMittenAvatarController(FloorplanController):
 
         self._start_task()
 
-        # Get the mitten's position.
-        if arm == Arm.left:
-            mitten = np.array(self._avatar.frame.get_mitten_center_left_position())
-        else:
-            mitten = np.array(self._avatar.frame.get_mitten_center_right_position())
+        # Get the mitten's position. Copy the array because the raycast origin is modified in place.
+        mitten = np.array(self._avatar.frame.mittens[arm])
         # Raycast to the target to get a target position.
         raycast_ok, target = self._get_raycast_point(origin=mitten, object_id=object_id, forward=0.01)
 
@@ -649,8 +650,8 @@ class StickyMittenAvatarController(FloorplanController):
             :return: Whether avatar succeed, failed, or is presently turning and the current angle.
             """
 
-            angle = get_angle(origin=np.array(self._avatar.frame.get_position()),
-                              forward=np.array(self._avatar.frame.get_forward()),
+            angle = get_angle(origin=self._avatar.frame.position,
+                              forward=self._avatar.frame.forward,
                               position=target)
             # Arrived at the correct alignment.
             if np.abs(angle) < stopping_threshold or np.abs(angle) > np.abs(initial_angle):
@@ -659,7 +660,7 @@ class StickyMittenAvatarController(FloorplanController):
             return TaskStatus.ongoing, angle
         # Set the target to the object's position.
         if isinstance(target, int):
-            target = self.frames[-1].object_transforms[target].position
+            target = np.array(self.frames[-1].object_transforms[target].position)
         # Convert the Vector3 target to a numpy array.
         else:
             target = TDWUtils.vector3_to_array(target)
@@ -667,8 +668,8 @@ class StickyMittenAvatarController(FloorplanController):
         self._start_task()
 
         # Get the angle to the target.
-        initial_angle = get_angle(origin=np.array(self._avatar.frame.get_position()),
-                                  forward=np.array(self._avatar.frame.get_forward()),
+        initial_angle = get_angle(origin=self._avatar.frame.position,
+                                  forward=self._avatar.frame.forward,
                                   position=target)
         # Decide the shortest way to turn.
         if initial_angle > 0:
@@ -695,7 +696,7 @@ class StickyMittenAvatarController(FloorplanController):
             # Coast to a stop.
             coasting = True
             while coasting:
-                coasting = np.linalg.norm(self._avatar.frame.get_angular_velocity()) > 0.3
+                coasting = np.linalg.norm(self._avatar.frame.raw.get_angular_velocity()) > 0.3
                 state, previous_angle = _get_turn_state()
                 # The turn succeeded!
                 if state == TaskStatus.success:
@@ -739,10 +740,10 @@ class StickyMittenAvatarController(FloorplanController):
         """
 
         # Rotate the forward directional vector.
-        p0 = self._avatar.frame.get_forward()
+        p0 = self._avatar.frame.forward
         p1 = rotate_point_around(origin=np.array([0, 0, 0]), point=p0, angle=angle)
         # Get a point to look at.
-        p1 = np.array(self._avatar.frame.get_position()) + (p1 * 1000)
+        p1 = self._avatar.frame.position + (p1 * 1000)
         return self.turn_to(target=TDWUtils.array_to_vector3(p1), force=force, stopping_threshold=stopping_threshold)
 
     def go_to(self, target: Union[Dict[str, float], int], turn_force: float = 1000, move_force: float = 80,
@@ -789,7 +790,7 @@ class StickyMittenAvatarController(FloorplanController):
                     if name.startswith("A_StickyMitten"):
                         return TaskStatus.collided_with_environment
 
-            p = np.array(self._avatar.frame.get_position())
+            p = self._avatar.frame.position
             d_from_initial = np.linalg.norm(initial_position - p)
             # Overshot. End.
             if d_from_initial > initial_distance:
@@ -812,10 +813,10 @@ class StickyMittenAvatarController(FloorplanController):
 
         self._start_task()
 
-        initial_position = self._avatar.frame.get_position()
+        initial_position = self._avatar.frame.position
 
         # Get the distance to the target.
-        initial_distance = np.linalg.norm(np.array(initial_position) - target)
+        initial_distance = np.linalg.norm(initial_position - target)
 
         # Turn to the target.
         status = self.turn_to(target=TDWUtils.array_to_vector3(target), force=turn_force,
@@ -844,7 +845,7 @@ class StickyMittenAvatarController(FloorplanController):
                 self._stop_avatar()
                 return t
             # Glide.
-            while np.linalg.norm(self._avatar.frame.get_velocity()) > 0.1:
+            while np.linalg.norm(self._avatar.frame.raw.get_velocity()) > 0.1:
                 self.communicate([])
                 t = _get_state()
                 if t == TaskStatus.success:
@@ -880,7 +881,7 @@ class StickyMittenAvatarController(FloorplanController):
         """
 
         # The target is at `distance` away from the avatar's position along the avatar's forward directional vector.
-        target = np.array(self._avatar.frame.get_position()) + (np.array(self._avatar.frame.get_forward()) * distance)
+        target = self._avatar.frame.position + (self._avatar.frame.forward * distance)
         return self.go_to(target=target, move_force=move_force, move_stopping_threshold=move_stopping_threshold,
                           stop_on_collision=stop_on_collision)
 
@@ -1076,10 +1077,7 @@ class StickyMittenAvatarController(FloorplanController):
         self._start_task()
 
         # Get the origin of the raycast.
-        if arm == Arm.left:
-            origin = np.array(self._avatar.frame.get_mitten_center_left_position())
-        else:
-            origin = self._avatar.frame.get_mitten_center_right_position()
+        origin = self._avatar.frame.mittens[arm]
 
         success, target = self._get_raycast_point(object_id=object_id, origin=np.array(origin), forward=0.01)
 
@@ -1087,8 +1085,8 @@ class StickyMittenAvatarController(FloorplanController):
         if not success:
             return TaskStatus.bad_raycast
 
-        angle = get_angle_between(v1=FORWARD, v2=self._avatar.frame.get_forward())
-        target = rotate_point_around(point=target - self._avatar.frame.get_position(), angle=-angle)
+        angle = get_angle_between(v1=FORWARD, v2=self._avatar.frame.forward)
+        target = rotate_point_around(point=target - self._avatar.frame.position, angle=-angle)
 
         # Couldn't bend the arm to the target.
         reach_status = self.reach_for_target(target=TDWUtils.array_to_vector3(target), arm=arm)
@@ -1096,7 +1094,7 @@ class StickyMittenAvatarController(FloorplanController):
             return reach_status
 
         # Tap the object.
-        p = target + np.array(self._avatar.frame.get_forward()) * 1.1
+        p = target + self._avatar.frame.forward * 1.1
         self.reach_for_target(target=TDWUtils.array_to_vector3(p), arm=arm, check_if_possible=False, do_motion=False)
         # Get the mitten ID.
         mitten_id = 0
@@ -1144,13 +1142,13 @@ class StickyMittenAvatarController(FloorplanController):
         # Raycast to the center of the bounds to get the nearest point.
         destination = TDWUtils.array_to_vector3(bounds.get_center(0))
         # Add a forward directional vector.
-        origin += np.array(self._avatar.frame.get_forward()) * forward
+        origin += self._avatar.frame.forward * forward
         origin[1] = destination["y"]
         resp = self.communicate({"$type": "send_raycast",
                                  "origin": TDWUtils.array_to_vector3(origin),
                                  "destination": destination})
         raycast = get_data(resp=resp, d_type=Raycast)
-        point = np.array(raycast.get_point())
+        point = np.array(raycast.get_point(), dtype=np.float32)
         return raycast.get_hit() and raycast.get_object_id() is not None and raycast.get_object_id() == object_id, point
 
     def _get_audio_commands(self) -> List[dict]:
@@ -24,15 +24,23 @@ class Transform:
     - `position` The position of the object as a numpy array.
     - `rotation` The rotation (quaternion) of the object as a numpy array.
     - `forward` The forward directional vector of the object as a numpy array.
+    - `data` The position, rotation, and forward as a single float32 numpy array of shape (10,). `position`, `rotation`, and `forward` are views of this array.
     """
 
-    def __init__(self, position: np.array, rotation: np.array, forward: np.array):
+    def __init__(self, position: np.array, rotation: np.array, forward: np.array, data: np.array = None):
         """
         :param position: The position of the object as a numpy array.
         :param rotation: The rotation (quaternion) of the object as a numpy array.
         :param forward: The forward directional vector of the object as a numpy array.
+        :param data: If not None, the float32 numpy array of shape (10,) that will store the transform data, e.g. a row of an array of many transforms. If None, a new array is created.
         """
 
-        self.position = position
-        self.rotation = rotation
-        self.forward = forward
+        if data is None:
+            data = np.empty(10, dtype=np.float32)
+        data[0:3] = position
+        data[3:7] = rotation
+        data[7:10] = forward
+        self.data = data
+        self.position = data[0:3]
+        self.rotation = data[3:7]
+        self.forward = data[7:10]
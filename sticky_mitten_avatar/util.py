@@ -1,5 +1,6 @@
+from math import atan2, cos, pi, sin
 import numpy as np
-from typing import Dict, List, TypeVar, Type, Optional
+from typing import Dict, List, TypeVar, Type, Optional, Iterator, Tuple, Union
 from tdw.output_data import OutputData, Transforms, Rigidbodies, Bounds, Images, SegmentationColors, Volumes, Raycast, \
     CompositeObjects, CameraMatrices
 
@@ -16,14 +17,62 @@ _OUTPUT_IDS: Dict[Type[OutputData], str] = {Transforms: "tran",
                                             CompositeObjects: "comp",
                                             CameraMatrices: "cama"}
 # Global forward directional vector.
-FORWARD = np.array([0, 0, 1])
+FORWARD = np.array([0, 0, 1], dtype=np.float32)
+# Conversion factors between degrees and radians.
+_DEG2RAD = pi / 180.0
+_RAD2DEG = 180.0 / pi
+# The names of the points returned by `get_bounds_points()`, in order.
+BOUNDS_POINT_NAMES = ("top", "bottom", "left", "right", "front", "back")
 
 
-def get_data(resp: List[bytes], d_type: Type[T]) -> Optional[T]:
+def iter_resp(resp: List[bytes]) -> Iterator[Tuple[str, bytes]]:
     """
-    Parse the output data list of byte arrays to get a single type output data object.
+    Iterate through the output data in the response from the build, parsing the ID of each output data type once.
 
     :param resp: The response from the build (a list of byte arrays).
+
+    :return: Yields tuples: The output data ID and the output data byte array. The last element of `resp` (the frame number) is skipped.
+    """
+
+    for i in range(len(resp) - 1):
+        yield OutputData.get_data_type_id(resp[i]), resp[i]
+
+
+class RespIndex:
+    """
+    The output data in the response from the build, grouped by output data ID.
+    The ID of each output data type is parsed only once, when the index is created.
+
+    Fields:
+
+    - `resp` The response from the build (a list of byte arrays).
+    """
+
+    def __init__(self, resp: List[bytes]):
+        """
+        :param resp: The response from the build (a list of byte arrays).
+        """
+
+        self.resp = resp
+        self._data: Dict[str, List[bytes]] = dict()
+        for r_id, r in iter_resp(resp):
+            self._data.setdefault(r_id, []).append(r)
+
+    def get(self, r_id: str) -> List[bytes]:
+        """
+        :param r_id: The output data ID, for example `"tran"`.
+
+        :return: A list of each output data byte array with this ID, in the order of the response.
+        """
+
+        return self._data.get(r_id, [])
+
+
+def get_data(resp: Union[List[bytes], RespIndex], d_type: Type[T]) -> Optional[T]:
+    """
+    Parse the output data list of byte arrays to get a single type output data object.
+
+    :param resp: The response from the build (a list of byte arrays), or a `RespIndex` of the response.
     :param d_type: The desired type of output data.
 
     :return: An object of type `d_type` from `resp`. If there is no object, returns None.
@@ -32,27 +81,32 @@ def get_data(resp: List[bytes], d_type: Type[T]) -> Optional[T]:
     if d_type not in _OUTPUT_IDS:
         raise Exception(f"Output data ID not defined: {d_type}")
 
-    for i in range(len(resp) - 1):
-        r_id = OutputData.get_data_type_id(resp[i])
-        if r_id == _OUTPUT_IDS[d_type]:
-            return d_type(resp[i])
+    d_type_id = _OUTPUT_IDS[d_type]
+    if isinstance(resp, RespIndex):
+        data = resp.get(d_type_id)
+        if len(data) > 0:
+            return d_type(data[0])
+        return None
+    for r_id, r in iter_resp(resp):
+        if r_id == d_type_id:
+            return d_type(r)
     return None
 
 
-def get_bounds_dict(bounds: Bounds, index: int) -> Dict[str, np.array]:
+def get_bounds_points(bounds: Bounds, index: int) -> np.array:
     """
     :param bounds: Bounds output data.
     :param index: The index in `bounds` of the target object.
 
-    :return: A dictionary of the bounds. Key = the name of the position. Value = the position as a numpy array.
+    :return: The points of the bounds as a (6, 3) numpy array, in the order of `BOUNDS_POINT_NAMES`.
     """
 
-    return {"top": np.array(bounds.get_top(index)),
-            "bottom": np.array(bounds.get_bottom(index)),
-            "left": np.array(bounds.get_left(index)),
-            "right": np.array(bounds.get_right(index)),
-            "front": np.array(bounds.get_front(index)),
-            "back": np.array(bounds.get_back(index))}
+    return np.array([bounds.get_top(index),
+                     bounds.get_bottom(index),
+                     bounds.get_left(index),
+                     bounds.get_right(index),
+                     bounds.get_front(index),
+                     bounds.get_back(index)], dtype=np.float32)
 
 
 def get_closest_point_in_bounds(origin: np.array, bounds: Bounds, index: int) -> np.array:
@@ -64,17 +118,11 @@ def get_closest_point_in_bounds(origin: np.array, bounds: Bounds, index: int) ->
     :return: The point on the object bounds closests to `origin`.
     """
 
-    object_bounds = get_bounds_dict(bounds=bounds, index=index)
+    points = get_bounds_points(bounds=bounds, index=index)
 
     # Get the closest point on the bounds.
-    min_destination = ""
-    min_distance = 10000
-    for p in object_bounds:
-        d = np.linalg.norm(origin - object_bounds[p])
-        if d < min_distance:
-            min_distance = d
-            min_destination = p
-    return object_bounds[min_destination]
+    diff = points - origin
+    return points[np.argmin(np.einsum("ij,ij->i", diff, diff))]
 
 
 def get_angle(forward: np.array, origin: np.array, position: np.array) -> float:
@@ -86,18 +134,16 @@ def get_angle(forward: np.array, origin: np.array, position: np.array) -> float:
       :return: The angle in degrees between `forward` and the direction vector from `origin` to `position`.
       """
 
-    # Get the normalized directional vector to the target position.
-    p0 = np.array([origin[0], origin[2]])
-    p1 = np.array([position[0], position[2]])
-    d = p1 - p0
-    d = d / np.linalg.norm(d)
-    f = np.array([forward[0], forward[2]])
+    # Get the directional vector to the target position.
+    # It doesn't need to be normalized because atan2 only uses the ratio of `det` and `dot`.
+    dx = float(position[0]) - float(origin[0])
+    dz = float(position[2]) - float(origin[2])
+    fx = float(forward[0])
+    fz = float(forward[2])
 
-    dot = f[0] * d[0] + f[1] * d[1]
-    det = f[0] * d[1] - f[1] * d[0]
-    angle = np.arctan2(det, dot)
-    angle = np.rad2deg(angle)
-    return angle
+    dot = fx * dx + fz * dz
+    det = fx * dz - fz * dx
+    return atan2(det, dot) * _RAD2DEG
 
 
 def get_angle_between(v1: np.array, v2: np.array) -> float:
@@ -108,10 +154,10 @@ def get_angle_between(v1: np.array, v2: np.array) -> float:
     :return: The angle in degrees between two directional vectors.
     """
 
-    ang1 = np.arctan2(v1[2], v1[0])
-    ang2 = np.arctan2(v2[2], v2[0])
+    ang1 = atan2(float(v1[2]), float(v1[0]))
+    ang2 = atan2(float(v2[2]), float(v2[0]))
 
-    return np.rad2deg((ang1 - ang2) % (2 * np.pi))
+    return ((ang1 - ang2) % (2 * pi)) * _RAD2DEG
 
 
 def rotate_point_around(point: np.array, angle: float, origin: np.array = None) -> np.array:
@@ -124,16 +170,20 @@ def rotate_point_around(point: np.array, angle: float, origin: np.array = None)
     """
 
     if origin is None:
-        origin = np.array([0, 0, 0])
-
-    radians = np.deg2rad(angle)
-    x, y = point[0], point[2]
-    offset_x, offset_y = origin[0], origin[2]
-    adjusted_x = (x - offset_x)
-    adjusted_y = (y - offset_y)
-    cos_rad = np.cos(radians)
-    sin_rad = np.sin(radians)
-    qx = offset_x + cos_rad * adjusted_x + sin_rad * adjusted_y
-    qy = offset_y + -sin_rad * adjusted_x + cos_rad * adjusted_y
-
-    return np.array([qx, point[1], qy])
+        offset_x = 0.0
+        offset_y = 0.0
+    else:
+        offset_x = float(origin[0])
+        offset_y = float(origin[2])
+
+    radians = angle * _DEG2RAD
+    adjusted_x = float(point[0]) - offset_x
+    adjusted_y = float(point[2]) - offset_y
+    cos_rad = cos(radians)
+    sin_rad = sin(radians)
+
+    out = np.empty(3)
+    out[0] = offset_x + cos_rad * adjusted_x + sin_rad * adjusted_y
+    out[1] = point[1]
+    out[2] = offset_y + -sin_rad * adjusted_x + cos_rad * adjusted_y
+    return out
@@ -0,0 +1,69 @@
+import numpy as np
+from sticky_mitten_avatar.avatars import Arm
+from sticky_mitten_avatar.avatars.baby import Baby
+
+
+class AnalyticIKTest:
+    """
+    Test the IK solutions of the arms over a grid of targets. This test doesn't require the build.
+
+    For each target that ikpy can reach, the forward kinematics of the IK solution must reach the target too.
+    The analytic solution alone must reach most of these targets.
+    """
+
+    # The maximum distance between the mitten and the target.
+    MAX_ERROR = 0.01
+    # The minimum fraction of the reachable targets that the analytic solution must reach.
+    MIN_ANALYTIC_FRACTION = 0.85
+
+    def __init__(self):
+        self.avatar: Baby = Baby._get_ik_solver()
+
+    def run(self, arm: Arm) -> None:
+        """
+        Test the IK solutions of an arm.
+
+        :param arm: The arm.
+        """
+
+        num_reachable = 0
+        num_analytic = 0
+        for x in np.arange(-0.6, 0.61, 0.1):
+            for y in np.arange(0.2, 1.01, 0.1):
+                for z in np.arange(0, 0.61, 0.1):
+                    target = np.array([x, y, z], dtype=np.float32)
+                    # Ignore targets that are too close to the avatar.
+                    if x * x + z * z < 0.2 ** 2:
+                        continue
+                    # Ignore targets that ikpy can't reach.
+                    ikpy_rotations = self.avatar._arms[arm].inverse_kinematics(target_position=target)
+                    if self._get_error(arm=arm, rotations=ikpy_rotations, target=target) > AnalyticIKTest.MAX_ERROR:
+                        continue
+                    num_reachable += 1
+                    analytic_rotations = self.avatar._analytic_ik(arm=arm, target=target)
+                    if self._get_error(arm=arm, rotations=analytic_rotations, target=target) <= \
+                            AnalyticIKTest.MAX_ERROR:
+                        num_analytic += 1
+                    rotations, ik_target = self.avatar._get_ik(target=target, arm=arm)
+                    error = self._get_error(arm=arm, rotations=rotations, target=target)
+                    assert error <= AnalyticIKTest.MAX_ERROR, (arm, target, error)
+        print(f"{arm.name}: {num_reachable} reachable targets. "
+              f"The analytic solution reached {num_analytic}; ikpy reached the rest.")
+        assert num_analytic >= AnalyticIKTest.MIN_ANALYTIC_FRACTION * num_reachable, (arm, num_analytic, num_reachable)
+
+    def _get_error(self, arm: Arm, rotations: np.array, target: np.array) -> float:
+        """
+        :param arm: The arm.
+        :param rotations: The IK solution.
+        :param target: The target.
+
+        :return: The distance from the mitten to the target.
+        """
+
+        return float(np.linalg.norm(self.avatar._get_mitten_position(arm=arm, rotations=rotations) - target))
+
+
+if __name__ == "__main__":
+    t = AnalyticIKTest()
+    t.run(arm=Arm.left)
+    t.run(arm=Arm.right)